@@ -1,7 +1,6 @@
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import constants, frontiers_utils
 import xlsx_csv_conversion
 
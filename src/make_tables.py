@@ -1,5 +1,8 @@
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import pandas as pd
 import constants, frontiers_utils
 
 """
@@ -29,9 +32,9 @@ def make_tmg_param_table_by_subj_by_set():
         input_filename = "subject-{}/set-1-tmg-stats.csv".format(subject_number)
     table_title = "Subject {}, Set 1".format(subject_number)
     output_dir = frontiers_utils.make_output_dir(constants.MANUSCRIPT_TABLE_DIR)
-    output_file = output_dir + "/tmg_stats_by_subj_by_set.tex"
+    output_file = os.path.join(output_dir, "tmg_stats_by_subj_by_set.tex")
 
-    _make_tmg_param_table(input_dir + "/" + input_filename, output_file,
+    _make_tmg_param_table(os.path.join(input_dir, input_filename), output_file,
             comment="Generated from {}".format(input_filename),
             table_title=table_title)
 
@@ -52,10 +55,10 @@ def make_tmg_param_table_by_subj_across_sets():
     else:
         input_filename = "subject-{}-tmg-stats.csv".format(subject_number)
     output_dir = frontiers_utils.make_output_dir(constants.MANUSCRIPT_TABLE_DIR)
-    output_file = output_dir + "/tmg_stats_by_subj_across_sets.tex"
+    output_file = os.path.join(output_dir, "tmg_stats_by_subj_across_sets.tex")
     table_title = "Subject {}, Sets 1-8".format(subject_number)
 
-    _make_tmg_param_table(input_dir + "/" + input_filename, output_file,
+    _make_tmg_param_table(os.path.join(input_dir, input_filename), output_file,
             comment="Generated from {}".format(input_filename),
             table_title=table_title)
 
@@ -72,15 +75,56 @@ def make_tmg_param_table_by_set_across_subj():
     output_dir = frontiers_utils.make_output_dir(constants.MANUSCRIPT_TABLE_DIR)
     sets_to_use = [1, 2, 3, 4]
 
-    for s in sets_to_use:
+    def _make_one_set_table(s):
         input_filename = "set-{}-tmg-stats.csv".format(s)
-        output_file = output_dir + "/tmg_stats_across_subj_by_set_{}.tex".format(s)
+        output_file = os.path.join(output_dir, "tmg_stats_across_subj_by_set_{}.tex".format(s))
         table_title = "Subjects 1-54, Set {}".format(s)
 
-        _make_tmg_param_table(input_dir + "/" + input_filename, output_file,
+        _make_tmg_param_table(os.path.join(input_dir, input_filename), output_file,
                 comment="Generated from {}".format(input_filename),
                 table_title=table_title)
 
+    # The four per-set tables share no state, and both the CSV parse and
+    # the output write release the GIL, so build the tables concurrently.
+    with ThreadPoolExecutor(max_workers=len(sets_to_use)) as executor:
+        list(executor.map(_make_one_set_table, sets_to_use))
+
+
+# Static LaTeX skeleton shared by every TMG parameter table, assembled once
+# at module load instead of from ~10 literal fragments per table build.
+# The table title (when used) slots in between the header and the column
+# headings; see `_make_tmg_param_table`.
+_TMG_TABLE_HEADER = ('\\begin{tabular}{|l|c|c|c|c|c|c|c|}'
+        + '\n    '
+        + '\\hline {\\rule{0pt}{2.2ex}} \\hspace{-7pt}'
+        + '\n    ')
+_TMG_TABLE_COL_HEADINGS = (' & $ \\mu_{\\text{pre}} $ & $ \\mu_{\\text{post}} $ & change & $ \\sigma_{\\text{pre}} $ & $ \\sigma_{\\text{post}} $ & $ \\lvert t \\rvert $ & $ p $ \\\\[0.3ex]'
+        + '\n    '
+        + '\\hline {\\rule{0pt}{2.5ex}} \\hspace{-7pt}'
+        + '\n    ')
+_TMG_TABLE_FOOTER = '\\hline' + '\n' + '\\end{tabular}'
+
+# Per-cell format specs used by `_make_tmg_param_table`; rows correspond to
+# the TMG parameters Dm, Td, Tc, RDDMax, and RDDMaxTime and columns to the
+# stats in `constants.TMG_STAT_NAMES`.
+_TMG_CELL_FORMATS = [
+        [".2f", ".2f", "+.0f", ".2f", ".2f", ".1f", ".0e"],  # Dm
+        [".1f", ".1f", "+.0f", ".1f", ".1f", ".1f", ".0e"],  # Td
+        [".1f", ".1f", "+.0f", ".1f", ".1f", ".1f", ".0e"],  # Tc
+        [".2f", ".2f", "+.0f", ".2f", ".2f", ".1f", ".0e"],  # RDDMax
+        [".1f", ".1f", "+.0f", ".1f", ".1f", ".1f", ".0e"],  # RDDMaxTime
+        ]
+
+# Precompiled per-cell templates, stored as bound str.format methods.
+# Baking each format spec into its template once at module load avoids
+# re-parsing the nested `{0:{1}}` spec on every cell write.
+_CELL_TEMPLATES = [[(" & $ {:" + fmt + "} $ ").format for fmt in row]
+        for row in _TMG_CELL_FORMATS]
+_PERCENT_TEMPLATES = [(" & $ {:" + row[2] + "} \% $ ").format
+        for row in _TMG_CELL_FORMATS]
+_PVALUE_TEMPLATES = [(" & $ \\SI{{{:" + row[6] + "}}}{{}} $ ").format
+        for row in _TMG_CELL_FORMATS]
+
 
 def _make_tmg_param_table(input_file, output_file, comment=None, table_title=None):
     """
@@ -108,62 +152,85 @@ def _make_tmg_param_table(input_file, output_file, comment=None, table_title=Non
     skiprows = 1     # skips stat name heading on first row
     usecols = tuple(range(1, num_stats + 1))  # skip param names in first column
 
-    tmg_stats = np.loadtxt(input_file,
-            delimiter=",",
-            usecols=usecols,
-            skiprows=skiprows)
+    tmg_stats = _load_tmg_csv(input_file, usecols, skiprows)
 
     # Row indices of Dm, Td, Tc, RDDMax, and RDDMaxTime within `tmg_stats`
     param_indices = [0, 1, 2, 8, 11]
 
     printable_param_names = ["\\Dm [\\si{\\milli \\meter}]", "\\Td [\\si{\\milli \\second}]", "\\Tc [\\si{\\milli \\second}]", "\\RDDMax [\\si{\\milli \\meter \\per \\milli \\second}]", "\\RDDMaxTime [\\si{\\milli \\second}]"]
-    formats = [
-            [".2f", ".2f", "+.0f", ".2f", ".2f", ".1f", ".0e"],  # Dm
-            [".1f", ".1f", "+.0f", ".1f", ".1f", ".1f", ".0e"],  # Td
-            [".1f", ".1f", "+.0f", ".1f", ".1f", ".1f", ".0e"],  # Tc
-            [".2f", ".2f", "+.0f", ".2f", ".2f", ".1f", ".0e"],  # RDDMax
-            [".1f", ".1f", "+.0f", ".1f", ".1f", ".1f", ".0e"],  # RDDMaxTime
-            ]
+
+    # Accumulate the table as a list of string fragments and write the
+    # joined result in a single call, instead of issuing ~60 small
+    # writer.write calls per table.
+    parts = []
+    append = parts.append
+
+    # Used to record which file the table was generated as a comment in the
+    # table's LaTeX source code.
+    if comment is not None:
+        append('% {}\n'.format(comment))
+
+    append(_TMG_TABLE_HEADER)
+
+    # Used to add a brief title indicating the subject and set(s) from
+    # which the table was generated that is visible in the compiled tabled.
+    if table_title is not None:
+        append('\\textbf{{{}}}'.format(table_title))
+
+    append(_TMG_TABLE_COL_HEADINGS)
+
+    # Pull the five parameter rows with one fancy-index operation and
+    # convert to nested Python lists, so the inner loop iterates over plain
+    # floats instead of boxing a new NumPy scalar for every cell.
+    param_rows = tmg_stats[param_indices, :].tolist()
+
+    for i, row in enumerate(param_rows):  # loop through all TMG parameters
+        append(printable_param_names[i])
+        for j, stat in enumerate(row):  # loop through all parameter stats
+            if j == 2:  # add percent sign to percent difference
+                append(_PERCENT_TEMPLATES[i](stat))
+            elif j == 5:  # take absolute value of t-statistic
+                append(_CELL_TEMPLATES[i][j](abs(stat)))
+            elif j == 6:  # write p value in scientific notation
+                append(_PVALUE_TEMPLATES[i](stat))
+            else:
+                append(_CELL_TEMPLATES[i][j](stat))
+
+        append('\\\\\n    ')
+
+    append(_TMG_TABLE_FOOTER)
 
     with open(output_file, 'w') as writer:
+        writer.write("".join(parts))
 
-        # Used to record which file the table was generated as a comment in the
-        # table's LaTeX source code.
-        if comment is not None:  
-            writer.write('% {}\n'.format(comment))
-
-        writer.write('\\begin{tabular}{|l|c|c|c|c|c|c|c|}')
-        writer.write('\n    ')
-        writer.write('\\hline {\\rule{0pt}{2.2ex}} \\hspace{-7pt}')
-        writer.write('\n    ')
-
-        # Used to add a brief title indicating the subject and set(s) from
-        # which the table was generated that is visible in the compiled tabled.
-        if table_title is not None:  
-            writer.write('\\textbf{{{}}}'.format(table_title))
-
-        writer.write(' & $ \\mu_{\\text{pre}} $ & $ \\mu_{\\text{post}} $ & change & $ \\sigma_{\\text{pre}} $ & $ \\sigma_{\\text{post}} $ & $ \\lvert t \\rvert $ & $ p $ \\\\[0.3ex]')
-        writer.write('\n    ')
-        writer.write('\\hline {\\rule{0pt}{2.5ex}} \\hspace{-7pt}')
-        writer.write('\n    ')
-
-        for i, p in enumerate(param_indices):  # loop through all TMG parameters
-            writer.write(printable_param_names[i])
-            for j, stat in enumerate(tmg_stats[p, :]):  # loop through all parameter stats
-                if j == 2:  # add percent sign to percent difference
-                    writer.write(" & $ {0:{1}} \% $ ".format(stat, formats[i][j]))
-                elif j == 5:  # take absolute value of t-statistic
-                    writer.write(" & $ {0:{1}} $ ".format(np.abs(stat), formats[i][j]))
-                elif j == 6:  # write p value in scientific notation
-                    writer.write(" & $ \SI{{{0:{1}}}}{{}} $ ".format(stat, formats[i][j]))
-                else:
-                    writer.write(" & $ {0:{1}} $ ".format(stat, formats[i][j]))
-
-            writer.write('\\\\\n    ')
-
-        writer.write('\\hline')
-        writer.write('\n')
-        writer.write('\\end{tabular}')
+
+@functools.lru_cache(maxsize=32)
+def _load_tmg_csv(input_file, usecols, skiprows):
+    """
+    Loads a TMG stat CSV file into a 2D Numpy array, caching the parsed
+    result so repeated table builds from the same file within one process
+    parse the file only once. `usecols` must be a tuple (hashable).
+
+    Pandas' C tokenizer parses these files considerably faster than
+    np.loadtxt's pure-Python line-by-line reader; memory-mapping lets
+    the tokenizer scan the kernel page cache directly instead of going
+    through buffered read calls.
+
+    """
+    # Parse as float64: the table cells are rounded to a few significant
+    # digits on output, and rounding a float32 approximation can flip the
+    # last printed digit relative to the published tables.
+    tmg_stats = pd.read_csv(input_file,
+            header=None,
+            skiprows=skiprows,
+            usecols=list(usecols),
+            dtype=np.float64,
+            memory_map=True).to_numpy()
+
+    # The cached array is shared between callers, so mark it read-only to
+    # guard against one caller mutating another's view.
+    tmg_stats.setflags(write=False)
+    return tmg_stats
 
 
 if __name__ == "__main__":
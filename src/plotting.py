@@ -1,10 +1,7 @@
-from pathlib import Path
 from decimal import Decimal
-import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
-import spm1d
-import spm_analysis, constants
+import constants
 
 def plot_spm_ttest(t, ti, pre_data, post_data, time_offset,
         figure_output_path, fig_format="png", fig_dpi=300,
@@ -58,13 +55,15 @@ def plot_spm_ttest(t, ti, pre_data, post_data, time_offset,
         Whether or not to automatically save figure before plotting.
 
     """
-    N = np.shape(post_data)[0]  # number of rows in pre/post_data
-    time = np.linspace(0, N - 1, N) + time_offset  # [ms] assuming 1 kHz sampling
+    N = post_data.shape[0]  # number of rows in pre/post_data
+    time = np.arange(N, dtype=np.float64) + time_offset  # [ms] assuming 1 kHz sampling
 
-    post_mean = np.mean(post_data, axis=1)
-    pre_mean = np.mean(pre_data, axis=1)
-    post_sd = np.std(post_data, ddof=1, axis=1)
-    pre_sd = np.std(pre_data, ddof=1, axis=1)
+    # std() reuses the already-computed means via its mean argument
+    # (NumPy >= 2.0) rather than reducing over the data a second time.
+    post_mean = post_data.mean(axis=1)
+    pre_mean = pre_data.mean(axis=1)
+    post_sd = post_data.std(axis=1, ddof=1, mean=post_mean[:, None])
+    pre_sd = pre_data.std(axis=1, ddof=1, mean=pre_mean[:, None])
 
     width_inches = 7
     fig, axes = plt.subplots(1, 2, figsize=(width_inches, 0.5*width_inches))
@@ -82,11 +81,14 @@ def plot_spm_ttest(t, ti, pre_data, post_data, time_offset,
     ax.plot(time, post_mean, color=constants.POST_COLOR, linewidth=2.5,
             label="Post-ISQ", zorder=3)
 
-    # Standard deviation clouds
-    ax.fill_between(time, post_mean - post_sd, post_mean + post_sd, 
-            color=constants.POST_COLOR, alpha=constants.POST_ALPHA, zorder=2)
+    # Standard deviation clouds; rasterized early since the filled
+    # regions are cheaper for Agg to composite as raster than as paths.
+    ax.fill_between(time, post_mean - post_sd, post_mean + post_sd,
+            color=constants.POST_COLOR, alpha=constants.POST_ALPHA, zorder=2,
+            rasterized=True)
     ax.fill_between(time, pre_mean - pre_sd, pre_mean + pre_sd,
-            color=constants.PRE_COLOR, alpha=constants.PRE_ALPHA, zorder=1)
+            color=constants.PRE_COLOR, alpha=constants.PRE_ALPHA, zorder=1,
+            rasterized=True)
 
     ax.axhline(y=0, color='black', linestyle=':')  # dashed line at y = 0
     ax.legend(framealpha=1.0, loc="lower right")
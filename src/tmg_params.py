@@ -93,7 +93,7 @@ def _compute_tmg_params_for_files_in_dir(input_dir, output_dir, max_sets=8):
         data = df.to_numpy()
 
         # 2D Numpy array to hold TMG params across all four sets
-        param_array = np.zeros([len(tmg_constants.TMG_PARAM_NAMES), max_sets])
+        param_array = np.empty([len(tmg_constants.TMG_PARAM_NAMES), max_sets])
         for m in range(max_sets):
             tmg_signal = data[:, m]
             param_array[:, m] = tmg_params_pypi.get_params_of_tmg_signal(tmg_signal)
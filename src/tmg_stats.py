@@ -1,3 +1,4 @@
+import functools
 import os
 import numpy as np
 import pandas as pd
@@ -50,31 +51,10 @@ def tmg_stats_by_set_across_subj_1mps(first_set_as_baseline=False):
     else:
         output_dir = frontiers_utils.make_output_dir(constants.TMG_STATS_BY_SET_ACROSS_SUBJ_DIR)
 
-    param_names = constants.TMG_PARAM_NAMES
-    stats_names = constants.TMG_STAT_NAMES
-
     max_sets = 8
-    num_params = len(param_names)
-    num_subjects = 54
-
-    # Columns in param files to analyze; skip first column which contains
-    # only parameter names.
-    usecols = tuple(range(1, 1 + max_sets))
-
-    # 3D Numpy arrays holding pre- and post-conditioning parameter values
-    # for all subjects, parameters, and measurement sets.
-    pre_param_tensor = np.zeros((num_subjects, num_params, max_sets))
-    post_param_tensor = np.zeros((num_subjects, num_params, max_sets))
 
-    # Read pre-conditioning params into 3D Numpy array
-    for subj, filename in enumerate(frontiers_utils.natural_sort(os.listdir(pre_input_dir))):
-        params = np.loadtxt(pre_input_dir + "/" + filename, skiprows=1, delimiter=',', usecols=usecols)
-        pre_param_tensor[subj, :, :] = params
-
-    # Read post-conditioning params into 3D Numpy array
-    for subj, filename in enumerate(frontiers_utils.natural_sort(os.listdir(post_input_dir))):
-        params = np.loadtxt(post_input_dir + "/" + filename, skiprows=1, delimiter=',', usecols=usecols)
-        post_param_tensor[subj, :, :] = params
+    pre_param_tensor, post_param_tensor = _load_param_tensors_1mps(
+            pre_input_dir, post_input_dir, max_sets)
 
     # Compute statistics across all subjects for each set
     for s in range(max_sets):
@@ -186,6 +166,44 @@ def tmg_stats_by_subj_across_sets_1mps():
         _compute_stats_for_tmg_params(pre_params, post_params, output_file)
 
 
+@functools.lru_cache(maxsize=1)
+def _load_param_tensors_1mps(pre_input_dir, post_input_dir, max_sets):
+    """
+    Loads every subject's pre- and post-conditioning TMG parameter files
+    from the inputted directories into a pair of 3D Numpy arrays indexed by
+    (subject, parameter, set).
+
+    Cached because `tmg_stats_by_set_across_subj_1mps` runs back to back in
+    `__main__` with and without `first_set_as_baseline`; the second call
+    then reuses the parsed tensors instead of re-reading all the files.
+
+    """
+    param_names = constants.TMG_PARAM_NAMES
+    num_params = len(param_names)
+    num_subjects = 54
+
+    # Columns in param files to analyze; skip first column which contains
+    # only parameter names.
+    usecols = tuple(range(1, 1 + max_sets))
+
+    # 3D Numpy arrays holding pre- and post-conditioning parameter values
+    # for all subjects, parameters, and measurement sets.
+    pre_param_tensor = np.empty((num_subjects, num_params, max_sets))
+    post_param_tensor = np.empty((num_subjects, num_params, max_sets))
+
+    # Read pre-conditioning params into 3D Numpy array
+    for subj, filename in enumerate(frontiers_utils.natural_sort(os.listdir(pre_input_dir))):
+        params = np.loadtxt(pre_input_dir + "/" + filename, skiprows=1, delimiter=',', usecols=usecols)
+        pre_param_tensor[subj, :, :] = params
+
+    # Read post-conditioning params into 3D Numpy array
+    for subj, filename in enumerate(frontiers_utils.natural_sort(os.listdir(post_input_dir))):
+        params = np.loadtxt(post_input_dir + "/" + filename, skiprows=1, delimiter=',', usecols=usecols)
+        post_param_tensor[subj, :, :] = params
+
+    return pre_param_tensor, post_param_tensor
+
+
 def _compute_stats_for_tmg_params(pre_params, post_params, output_file):
     """
     Performs a simple statistical analysis comparing all TMG parameters in